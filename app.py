@@ -1,19 +1,27 @@
 import os
 import base64
 import pickle
+from email import policy
 from email.message import EmailMessage
+import numpy as np
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
-from PyPDF2 import PdfReader
+from google_auth_httplib2 import AuthorizedHttp
+import httplib2
+import fitz
 from google.oauth2 import service_account
+from google.oauth2.credentials import Credentials
 from google.cloud import firestore
 import json
+import asyncio
+import hashlib
+import time
 from datetime import datetime
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 
 # ================================
 # SETUP & CONFIGURATION
@@ -26,6 +34,13 @@ CSV_FILE = "Assistenzarzt_Jobs_CH__Combined_Final.csv"
 SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
 DB_COLLECTION = "job_applications_v2"
 DB_DOCUMENT_ID = "user_profile"
+EMAIL_MODEL = "gpt-4o-mini"
+TRANSLATION_MODEL = "gpt-4o"
+EMAIL_MAX_TOKENS = 600
+EMAIL_MEMO_TTL = 24 * 3600
+GMAIL_HTTP_TIMEOUT = 30
+DASHBOARD_PAGE_SIZE = 20
+JOB_COLUMNS = ["job_title", "hospital_name", "canton", "Application Contact Email", "Application URL", "Job Description (short)"]
 
 # ================================
 # FIREBASE & GMAIL AUTHENTICATION
@@ -44,14 +59,31 @@ def get_firestore_db():
         st.error(f"Failed to connect to Firebase: {e}")
         return None
 
+def _build_gmail_service(creds):
+    """Builds the Gmail client on one reused httplib2 connection; not thread-safe, so keep it per session."""
+    if not creds.valid and creds.refresh_token:
+        creds.refresh(Request())
+    http = AuthorizedHttp(creds, http=httplib2.Http(timeout=GMAIL_HTTP_TIMEOUT))
+    return build("gmail", "v1", http=http, static_discovery=True, cache_discovery=False)
+
 def gmail_authenticate():
+    if st.session_state.get('gmail_service'):
+        return st.session_state.gmail_service
     db = get_firestore_db()
     creds = None
     if db:
         doc_ref = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID)
         doc = doc_ref.get()
-        if doc.exists and 'gmail_token' in doc.to_dict():
-            creds = pickle.loads(base64.b64decode(doc.to_dict()['gmail_token']))
+        stored = doc.to_dict() if doc.exists else {}
+        if 'gmail_token_json' in stored:
+            try:
+                creds = Credentials.from_authorized_user_info(json.loads(stored['gmail_token_json']), SCOPES)
+            except ValueError:
+                creds = None  # Incomplete token (e.g. no refresh_token): go through consent again
+        elif 'gmail_token' in stored:
+            # One-time migration of the legacy pickled token to JSON
+            creds = pickle.loads(base64.b64decode(stored['gmail_token']))
+            doc_ref.update({'gmail_token_json': creds.to_json(), 'gmail_token': firestore.DELETE_FIELD})
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -66,36 +98,77 @@ def gmail_authenticate():
             creds = flow.run_local_server(port=0)
         
         if db:
-            token_b64 = base64.b64encode(pickle.dumps(creds)).decode('utf-8')
-            doc_ref.set({'gmail_token': token_b64}, merge=True)
+            doc_ref.set({'gmail_token_json': creds.to_json()}, merge=True)
             
-    return build("gmail", "v1", credentials=creds)
+    return _build_gmail_service(creds)
 
 # ================================
 # API & HELPER FUNCTIONS
 # ================================
-def call_openai_api(prompt, system_message="You are a helpful assistant."):
-    """Generic function to call the OpenAI API."""
+def _build_messages(prompt, system_message, dynamic_suffix=None):
+    messages = [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": prompt},
+    ]
+    if dynamic_suffix:
+        messages.append({"role": "user", "content": dynamic_suffix})
+    return messages
+
+def call_openai_api(prompt, system_message="You are a helpful assistant.", dynamic_suffix=None, model=EMAIL_MODEL, max_tokens=None):
+    """Generic function to call the OpenAI API.
+
+    `prompt` should be the part that stays identical across calls (e.g. the CV) so OpenAI's
+    automatic prompt caching can reuse it; per-call content goes into `dynamic_suffix`.
+    """
     try:
         if not OPENAI_API_KEY:
             st.error("OpenAI API key is not configured.")
             return None
         response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.5,
+            model=model,
+            messages=_build_messages(prompt, system_message, dynamic_suffix),
+            temperature=0.3,
+            max_tokens=max_tokens,
         )
         return response.choices[0].message.content.strip()
     except Exception as e:
         st.error(f"Error calling OpenAI API: {e}")
         return None
 
-def generate_personalized_email(cv_content, job_title=None, hospital_name=None, canton=None, job_description=None):
-    """Generates an email subject and body using OpenAI, adaptable for structured or unstructured job info."""
-    
+def call_openai_api_stream(prompt, system_message="You are a helpful assistant.", dynamic_suffix=None, placeholder=None, model=EMAIL_MODEL, max_tokens=None):
+    """Streaming variant of call_openai_api; renders the partial output into `placeholder` as it arrives."""
+    try:
+        if not OPENAI_API_KEY:
+            st.error("OpenAI API key is not configured.")
+            return None
+        response = client.chat.completions.create(
+            model=model,
+            messages=_build_messages(prompt, system_message, dynamic_suffix),
+            temperature=0.3,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        buf = []
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                buf.append(delta)
+                if placeholder:
+                    placeholder.markdown("".join(buf))
+        return "".join(buf).strip()
+    except Exception as e:
+        st.error(f"Error calling OpenAI API: {e}")
+        return None
+
+def normalize_cv_text(cv_content):
+    """Collapses trailing whitespace and blank-line runs so the CV prompt prefix is byte-identical across calls."""
+    lines = [line.rstrip() for line in (cv_content or "").strip().splitlines()]
+    return "\n".join(line for i, line in enumerate(lines) if line or (i and lines[i - 1]))
+
+def _build_email_prompts(cv_content, job_title=None, hospital_name=None, canton=None, job_description=None):
+    """Returns (stable prompt, system message, job-specific suffix) for the application email."""
     # Constructing the job details part of the prompt
     if job_title and hospital_name: # Structured data from CSV
         job_details_prompt = f"""
@@ -115,51 +188,121 @@ def generate_personalized_email(cv_content, job_title=None, hospital_name=None,
 ---
 """
 
+    # Stable prefix first (identical for every job while the CV is unchanged) so it can be prompt-cached
     prompt = f"""
 Act as a professional medical career advisor in Switzerland.
 Your task is to create a compelling application email in German.
 
+**Instructions:**
+1.  **Analyze Job Details:** If the job details are in a block of text, first identify the likely job title and company/hospital name.
+2.  **Generate a Subject Line:** Create a concise, professional German subject line for the application.
+3.  **Generate an Email Body:** Write a polite, personalized email connecting the applicant's CV to the job requirements.
+
 **Applicant's Profile (from CV):**
 ---
-{cv_content}
+{normalize_cv_text(cv_content)}
 ---
+"""
+    job_prompt = f"""
 **Job Details:**
 {job_details_prompt}
 
-**Instructions:**
-1.  **Analyze Job Details:** If the job details are in a block of text, first identify the likely job title and company/hospital name.
-2.  **Generate a Subject Line:** Create a concise, professional German subject line for the application.
-3.  **Generate an Email Body:** Write a polite, personalized email connecting the applicant's CV to the job requirements.
-4.  **Output Format:** Your final output MUST contain the subject and body separated by '|||'.
-    Example: Betreff: Bewerbung als Assistenzarzt|||Sehr geehrte Damen und Herren,...
+**Output Format:** Your final output MUST contain the subject and body separated by '|||'.
+Example: Betreff: Bewerbung als Assistenzarzt|||Sehr geehrte Damen und Herren,...
 """
-    response = call_openai_api(prompt, "You are a professional medical job applicant assistant, writing in German.")
+    return prompt, "You are a professional medical job applicant assistant, writing in German.", job_prompt
+
+def _parse_email_response(response):
+    """Returns (email_content, ok); ok is False when the reply was missing or not in the expected format."""
     if response and '|||' in response:
         parts = response.split('|||', 1)
         subject = parts[0].replace('Betreff:', '').replace('Subject:', '').strip()
         body = parts[1].strip()
-        return {'subject': subject, 'body': body}
+        return {'subject': subject, 'body': body}, True
     
-    return {'subject': f"Bewerbung für die ausgeschriebene Position", 'body': response or "Could not generate email body."}
+    return {'subject': f"Bewerbung für die ausgeschriebene Position", 'body': response or "Could not generate email body."}, False
+
+def _generate_email(cv_content, job_title=None, hospital_name=None, canton=None, job_description=None):
+    prompt, system_message, job_prompt = _build_email_prompts(cv_content, job_title, hospital_name, canton, job_description)
+    placeholder = st.empty()
+    response = call_openai_api_stream(prompt, system_message, job_prompt, placeholder, max_tokens=EMAIL_MAX_TOKENS)
+    placeholder.empty()
+    return _parse_email_response(response)
+
+def generate_personalized_email(cv_content, job_title=None, hospital_name=None, canton=None, job_description=None):
+    """Generates an email subject and body using OpenAI, adaptable for structured or unstructured job info."""
+    return _generate_email(cv_content, job_title, hospital_name, canton, job_description)[0]
 
-# ... (Other helper functions like translate_cv_text, send_email_logic, extract_text_from_pdf remain the same) ...
-def translate_cv_text(text):
-    prompt = f"Please translate the following CV text from English to professional, high-quality German suitable for a medical job application in Switzerland.\n\n**Text to Translate:**\n---\n{text}\n---"
+def _build_translation_prompts(text):
+    prompt = "Please translate the following CV text from English to professional, high-quality German suitable for a medical job application in Switzerland."
     system_message = "You are an expert translator specializing in medical and professional documents."
+    return prompt, system_message, f"**Text to Translate:**\n---\n{text}\n---"
+
+def summarize_cv(cv_text):
+    """One-off structured summary of the CV, used in per-job prompts instead of the full text."""
+    if not cv_text: return None
+    prompt = f"**CV:**\n---\n{cv_text}\n---"
+    system_message = (
+        "Produce a 250-word structured summary of the applicant's CV as JSON with the fields: "
+        "specialty, experience_years, languages, key_skills, education, highlights. "
+        "Keep the language of the CV. Output only the JSON."
+    )
     return call_openai_api(prompt, system_message)
 
+def email_profile():
+    """CV text used for email prompts: the summary when available, otherwise the full CV."""
+    return st.session_state.cv_summary or st.session_state.cv_content
+
+async def _call_openai_api_async(aclient, prompt, system_message, dynamic_suffix=None, model=EMAIL_MODEL, max_tokens=None):
+    try:
+        response = await aclient.chat.completions.create(
+            model=model,
+            messages=_build_messages(prompt, system_message, dynamic_suffix),
+            temperature=0.3,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        st.error(f"Error calling OpenAI API: {e}")
+        return None
+
+async def _translate_and_prewarm_email(text, job_details):
+    """Translates the CV while speculatively generating the email for the first job in the Job Finder."""
+    async with AsyncOpenAI(api_key=OPENAI_API_KEY) as aclient:
+        translation = _call_openai_api_async(aclient, *_build_translation_prompts(text), model=TRANSLATION_MODEL)
+        if not job_details:
+            return await translation, None
+        email = _call_openai_api_async(
+            aclient,
+            *_build_email_prompts(text, job_details['job_title'], job_details['hospital_name'], job_details['canton'], job_details['job_description']),
+            max_tokens=EMAIL_MAX_TOKENS,
+        )
+        translated, email_response = await asyncio.gather(translation, email)
+        email_content, ok = _parse_email_response(email_response)
+        return translated, email_content if ok else None
+
+def translate_cv_and_prewarm_email(text, job_details=None):
+    """Runs the CV translation and the first job's email generation concurrently; returns (translated_cv, email_content)."""
+    if not OPENAI_API_KEY:
+        st.error("OpenAI API key is not configured.")
+        return None, None
+    return asyncio.run(_translate_and_prewarm_email(text, job_details))
+
 def send_email_logic(service, to_email, subject, body, attachments):
+    """Sends the application; `attachments` is a list of (filename, bytes) tuples."""
     try:
         message = EmailMessage()
         message.set_content(body)
         message["To"] = to_email
         message["Subject"] = subject
         message["From"] = "me"
-        for uploaded_file in attachments:
-            uploaded_file.seek(0)
-            content = uploaded_file.read()
-            message.add_attachment(content, maintype="application", subtype="octet-stream", filename=uploaded_file.name)
-        encoded_message = base64.b64encode(message.as_bytes()).decode()
+        for name, data in attachments:
+            message.add_attachment(data, maintype="application", subtype="octet-stream", filename=name)
+        # Gmail expects URL-safe base64; drop each intermediate copy as soon as the next one exists
+        raw = message.as_bytes(policy=policy.SMTP)
+        del message
+        encoded_message = base64.urlsafe_b64encode(raw).decode("ascii")
+        del raw
         create_message = {"raw": encoded_message}
         service.users().messages().send(userId="me", body=create_message).execute()
         st.success(f"✅ Application successfully sent to {to_email}!")
@@ -170,9 +313,10 @@ def send_email_logic(service, to_email, subject, body, attachments):
 
 def extract_text_from_pdf(file):
     try:
-        reader = PdfReader(file)
-        text = "".join(page.extract_text() for page in reader.pages if page.extract_text())
-        return text
+        file.seek(0)
+        data = file.read()
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return "\n".join(page.get_text("text") for page in doc)
     except Exception as e:
         st.error(f"Error reading PDF file: {e}")
         return None
@@ -180,28 +324,130 @@ def extract_text_from_pdf(file):
 # ================================
 # DATABASE FUNCTIONS
 # ================================
-def get_user_data(db):
+def get_user_data_fields(db, fields):
+    """Reads only the given top-level fields of the user document (the stored CV is large)."""
     if not db: return {}
-    doc = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).get()
-    return doc.to_dict() if doc.exists else {}
+    doc = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).get(field_paths=fields)
+    return (doc.to_dict() or {}) if doc.exists else {}
 
 def update_user_data(db, data_to_update):
     if not db: return
     db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).set(data_to_update, merge=True)
 
+def load_user_progress(db):
+    """Reads applied_jobs and stats from Firestore once per session; later reruns use the local copy."""
+    if st.session_state.applied_jobs is None or st.session_state.stats is None:
+        user_data = get_user_data_fields(db, ["stats", "applied_jobs"])
+        st.session_state.applied_jobs = set(user_data.get("applied_jobs", []))
+        st.session_state.stats = dict(user_data.get("stats", {}))
+
+def record_job_done(job_id, stat_key):
+    """Mirrors a Firestore applied_jobs/stats write into the session copy."""
+    st.session_state.applied_jobs.add(str(job_id))
+    st.session_state.stats[stat_key] = st.session_state.stats.get(stat_key, 0) + 1
+
 def save_sent_email(db, email_data):
     if not db: return
     db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).collection("sent_emails").add(email_data)
 
+def mark_job_done(db, job_id, stat_key, email_data=None):
+    """Records a sent/skipped job (and optionally its sent email) in a single batched Firestore commit."""
+    if not db: return
+    batch = db.batch()
+    parent = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID)
+    batch.set(parent, {"applied_jobs": firestore.ArrayUnion([str(job_id)]), "stats": {stat_key: firestore.Increment(1)}}, merge=True)
+    if email_data:
+        batch.set(parent.collection("sent_emails").document(), email_data)
+    batch.commit()
+
+@st.cache_data(show_spinner=False)
+def _load_jobs(path):
+    """Parses the jobs CSV once per process; only the columns the Job Finder reads are kept."""
+    # C engine (handles quoted multi-line descriptions) with Arrow-backed storage. usecols is a callable
+    # because listing a column the CSV lacks would raise; explicit string dtypes keep an all-blank
+    # column from being typed as Arrow null, which has no .str accessor.
+    df = pd.read_csv(
+        path, usecols=lambda c: c in JOB_COLUMNS, dtype_backend="pyarrow",
+        dtype={c: "string[pyarrow]" for c in JOB_COLUMNS}
+    )
+    # Guarantee every column exists so rows can be read with .at[] instead of .get() defaults
+    for col in JOB_COLUMNS:
+        if col not in df.columns:
+            df[col] = "N/A" if col == "job_title" else ""
+    # Arrow-backed blanks are pd.NA, which can't be truth-tested or written to Firestore
+    df[JOB_COLUMNS] = df[JOB_COLUMNS].fillna("")
+    df["primary_email"] = df["Application Contact Email"].str.replace(r"(?s),.*", "", regex=True).str.strip()
+    df["email_valid"] = df["primary_email"].str.contains("@", na=False).astype(bool)
+    return df
+
+@st.cache_resource
+def _email_memo():
+    """Process-wide {(cv_hash, job_hash, job_id, model): (stored_at, email_content)} store shared by all sessions."""
+    return {}
+
+def _job_hash(details):
+    """Hash of the job fields the email is written from; job_id alone is just a CSV row position."""
+    fields = (details.get(k) for k in ('job_title', 'hospital_name', 'job_description', 'contact_email'))
+    return hashlib.sha256("\x1f".join(str(f or "") for f in fields).encode("utf-8")).hexdigest()
+
+def get_job_email(db, cv_content, details, regenerate=False):
+    """Returns the email for a CSV job, reusing a cached or stored one for the same CV, job and model unless `regenerate`."""
+    cv_hash = hashlib.sha256((cv_content or "").encode("utf-8")).hexdigest()
+    job_hash = _job_hash(details)
+    job_id = str(details['job_id'])
+    key = (cv_hash, job_hash, job_id, EMAIL_MODEL)
+    memo = _email_memo()
+    doc_ref = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).collection("generated_emails").document(job_id) if db else None
+
+    if not regenerate:
+        if key in memo and time.time() - memo[key][0] < EMAIL_MEMO_TTL:
+            return memo[key][1]
+        if doc_ref:
+            doc = doc_ref.get()
+            data = doc.to_dict() if doc.exists else {}
+            if data.get('cv_hash') == cv_hash and data.get('job_hash') == job_hash and data.get('model') == EMAIL_MODEL:
+                memo[key] = (time.time(), {'subject': data['subject'], 'body': data['body']})
+                return memo[key][1]
+
+    content, ok = _generate_email(
+        cv_content, details.get('job_title'), details.get('hospital_name'),
+        details.get('canton'), details.get('job_description')
+    )
+    if not ok:
+        return content  # Shown for editing, but never cached
+    memo[key] = (time.time(), content)
+    if doc_ref:
+        doc_ref.set({
+            "cv_hash": cv_hash, "job_hash": job_hash, "model": EMAIL_MODEL, "subject": content['subject'], "body": content['body'],
+            "generated_at": firestore.SERVER_TIMESTAMP
+        })
+    return content
+
 # ================================
 # UI PAGE FUNCTIONS
 # ================================
+def reset_dashboard():
+    """Drops the cached dashboard pages so the next visit starts again from the newest email."""
+    st.session_state.dashboard_emails = None
+    st.session_state.dashboard_cursors = [None]
+    st.session_state.dashboard_page = 0
+
+@st.fragment
 def render_dashboard(db):
     st.header("📊 Dashboard: Sent Applications")
-    emails_ref = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).collection("sent_emails").order_by("sent_at", direction=firestore.Query.DESCENDING).stream()
-    
-    emails = list(emails_ref)
-    if not emails:
+    emails_ref = db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).collection("sent_emails")
+    # List view only needs the header fields; bodies are fetched per email on demand
+    query = emails_ref.order_by("sent_at", direction=firestore.Query.DESCENDING).select(["recipient", "subject", "sent_at"])
+
+    # dashboard_cursors[i] is the snapshot page i starts after (None for the first page)
+    cursors = st.session_state.dashboard_cursors
+    page_no = st.session_state.dashboard_page
+    if st.session_state.dashboard_emails is None:
+        page_query = query if cursors[page_no] is None else query.start_after(cursors[page_no])
+        st.session_state.dashboard_emails = list(page_query.limit(DASHBOARD_PAGE_SIZE).stream())
+
+    emails = st.session_state.dashboard_emails
+    if not emails and page_no == 0:
         st.info("You haven't sent any emails yet. Head over to the 'Job Finder' to get started!")
         return
 
@@ -213,7 +459,25 @@ def render_dashboard(db):
             st.write(f"**Subject:** {data['subject']}")
             st.write(f"**Sent At:** {sent_time}")
             st.markdown("---")
-            st.text_area("Email Body", value=data['body'], height=300, disabled=True, key=f"body_{email.id}")
+            if email.id not in st.session_state.dashboard_bodies:
+                if st.button("Show Email Body", key=f"load_body_{email.id}"):
+                    body_doc = emails_ref.document(email.id).get(field_paths=["body"])
+                    st.session_state.dashboard_bodies[email.id] = (body_doc.to_dict() or {}).get('body', '')
+                    st.rerun(scope="fragment")
+            else:
+                st.text_area("Email Body", value=st.session_state.dashboard_bodies[email.id], height=300, disabled=True, key=f"body_{email.id}")
+
+    prev_col, next_col = st.columns(2)
+    if page_no > 0 and prev_col.button("⬅️ Newer"):
+        st.session_state.dashboard_page = page_no - 1
+        st.session_state.dashboard_emails = None
+        st.rerun(scope="fragment")
+    if len(emails) == DASHBOARD_PAGE_SIZE and next_col.button("Older ➡️"):
+        del cursors[page_no + 1:]
+        cursors.append(emails[-1])
+        st.session_state.dashboard_page = page_no + 1
+        st.session_state.dashboard_emails = None
+        st.rerun(scope="fragment")
 
 def render_manual_job_page():
     st.header("✍️ Add a Job Manually")
@@ -236,7 +500,7 @@ def render_manual_job_page():
             }
             with st.spinner("Analyzing details and generating email..."):
                 st.session_state.manual_email_content = generate_personalized_email(
-                    cv_content=st.session_state.cv_content, 
+                    cv_content=email_profile(), 
                     job_description=job_description
                 )
                 st.rerun() # Rerun to show the application form
@@ -246,21 +510,34 @@ def render_manual_job_page():
     if st.session_state.manual_email_content:
         render_application_form(is_manual=True)
 
+def find_next_job(jobs_df, applied_jobs):
+    """Returns (job_id, row) of the first job with a contact email that hasn't been applied to/skipped, or None."""
+    not_applied = ~np.isin(jobs_df.index.astype(str), list(applied_jobs))
+    candidates = np.flatnonzero(jobs_df["email_valid"].to_numpy() & not_applied)
+    if not candidates.size:
+        return None
+    idx = int(candidates[0])
+    return jobs_df.index[idx], jobs_df.iloc[idx]
+
+def job_details_from_row(job_id, row_data):
+    return {
+        "job_id": job_id, "job_title": row_data.at["job_title"],
+        "hospital_name": row_data.at["hospital_name"], "canton": row_data.at["canton"],
+        "contact_email": row_data.at["primary_email"],
+        "application_url": row_data.at["Application URL"],
+        "job_description": row_data.at["Job Description (short)"]
+    }
+
 def render_job_finder(db):
     st.header("🔍 Job Finder")
     try:
-        jobs_df = pd.read_csv(CSV_FILE)
-        user_data = get_user_data(db)
-        applied_jobs = set(user_data.get("applied_jobs", []))
+        jobs_df = _load_jobs(CSV_FILE)
+        load_user_progress(db)
+        applied_jobs = st.session_state.applied_jobs
     except FileNotFoundError:
         st.error(f"Error: '{CSV_FILE}' not found."); st.stop()
     
-    next_job = None
-    for idx, row in jobs_df.iterrows():
-        if str(idx) not in applied_jobs and isinstance(row.get("Application Contact Email"), str) and "@" in row.get("Application Contact Email", ""):
-            next_job = (idx, row)
-            break
-            
+    next_job = find_next_job(jobs_df, applied_jobs)
     if next_job is None:
         st.info("🎉 All jobs from the CSV have been processed!"); return
 
@@ -269,13 +546,7 @@ def render_job_finder(db):
     if st.session_state.current_job_id != job_id:
         st.session_state.current_job_id = job_id
         st.session_state.generated_email_content = None
-        st.session_state.current_job_details = {
-            "job_id": job_id, "job_title": row_data.get("job_title", "N/A"),
-            "hospital_name": row_data.get("hospital_name", ""), "canton": row_data.get("canton", ""),
-            "contact_email": str(row_data.get("Application Contact Email", "")).strip().split(",")[0],
-            "application_url": row_data.get("Application URL", ""),
-            "job_description": row_data.get("Job Description (short)", "")
-        }
+        st.session_state.current_job_details = job_details_from_row(job_id, row_data)
 
     details = st.session_state.current_job_details
     st.subheader(f"Next Up: {details['job_title']}")
@@ -288,21 +559,26 @@ def render_job_finder(db):
     col1, col2 = st.columns([3, 1])
     with col1:
         if st.button(f"🤖 Prepare Application for Job #{details['job_id']}"):
-             with st.spinner("Generating personalized email with OpenAI..."):
-                st.session_state.generated_email_content = generate_personalized_email(
-                    st.session_state.cv_content, details['job_title'], details['hospital_name'], 
-                    details['canton'], details['job_description']
-                )
+            # The prewarmed email was written from the source-language CV, so it is shown once but never cached
+            prewarmed = st.session_state.prewarmed_email
+            st.session_state.prewarmed_email = None
+            if prewarmed and prewarmed['job_id'] == details['job_id']:
+                st.session_state.generated_email_content = prewarmed['content']
+            else:
+                with st.spinner("Generating personalized email with OpenAI..."):
+                    st.session_state.generated_email_content = get_job_email(db, email_profile(), details)
     with col2:
         if st.button("Skip Job ⏭️"):
-            update_user_data(db, {"applied_jobs": firestore.ArrayUnion([str(details['job_id'])])})
-            db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).update({f'stats.skipped_count': firestore.Increment(1)})
+            mark_job_done(db, details['job_id'], 'skipped_count')
+            record_job_done(details['job_id'], 'skipped_count')
             st.warning(f"Skipped job #{details['job_id']}."); st.session_state.current_job_id = None; st.rerun()
 
     if st.session_state.get('generated_email_content'):
         render_application_form()
 
+@st.fragment
 def render_application_form(is_manual=False):
+    """Runs as a fragment: remove/regenerate only rerun this section; a send reruns the whole app."""
     st.markdown("---")
     st.subheader("✉️ Review, Edit, and Send Application")
 
@@ -318,15 +594,16 @@ def render_application_form(is_manual=False):
     # Handle regeneration
     if st.button("🔄 Regenerate Email", key=f"regen_{form_key}"):
         with st.spinner("Regenerating..."):
-            new_content = generate_personalized_email(
-                st.session_state.cv_content, details.get('job_title'), details.get('hospital_name'), 
-                details.get('canton'), details.get('job_description')
-            )
             if is_manual:
-                st.session_state.manual_email_content = new_content
+                st.session_state.manual_email_content = generate_personalized_email(
+                    email_profile(), details.get('job_title'), details.get('hospital_name'), 
+                    details.get('canton'), details.get('job_description')
+                )
             else:
-                st.session_state.generated_email_content = new_content
-            st.rerun()
+                st.session_state.generated_email_content = get_job_email(
+                    st.session_state.db, email_profile(), details, regenerate=True
+                )
+            st.rerun(scope="fragment")
 
     with st.form(key=form_key):
         contact_email = st.text_input("To (Contact Email)", value=details.get('contact_email', ''))
@@ -340,34 +617,36 @@ def render_application_form(is_manual=False):
         send_button = st.form_submit_button("🚀 Send Application")
 
     # Attachment management outside the form
-    if st.session_state.attachments:
+    if st.session_state.attachment_blobs:
         st.write("Current Attachments:")
-        for i in range(len(st.session_state.attachments) - 1, -1, -1):
-            file = st.session_state.attachments[i]
+        for i in range(len(st.session_state.attachment_blobs) - 1, -1, -1):
+            name, _ = st.session_state.attachment_blobs[i]
             c1, c2 = st.columns([0.8, 0.2])
-            c1.info(f"📄 {file.name}")
-            if c2.button(f"Remove", key=f"remove_{i}_{file.name}"):
-                st.session_state.attachments.pop(i)
-                st.rerun()
+            c1.info(f"📄 {name}")
+            if c2.button(f"Remove", key=f"remove_{i}_{name}"):
+                st.session_state.attachment_blobs.pop(i)
+                st.rerun(scope="fragment")
 
     if send_button:
-        all_attachments = st.session_state.attachments + (new_attachments or [])
+        all_attachments = st.session_state.attachment_blobs + [(f.name, f.getvalue()) for f in new_attachments or []]
         if not all_attachments:
             st.warning("You must have at least one attachment."); return
 
         if send_email_logic(st.session_state.gmail_service, contact_email, subject, body, all_attachments):
-            save_sent_email(st.session_state.db, {
+            email_data = {
                 "recipient": contact_email, "subject": subject, "body": body,
                 "sent_at": firestore.SERVER_TIMESTAMP, "job_title": details.get('job_title', 'Manual Entry'),
                 "hospital_name": details.get('hospital_name', 'Manual Entry')
-            })
+            }
             if not is_manual:
-                update_user_data(st.session_state.db, {"applied_jobs": firestore.ArrayUnion([str(details['job_id'])])})
-                st.session_state.db.collection(DB_COLLECTION).document(DB_DOCUMENT_ID).update({f'stats.sent_count': firestore.Increment(1)})
+                mark_job_done(st.session_state.db, details['job_id'], 'sent_count', email_data)
+                record_job_done(details['job_id'], 'sent_count')
                 st.session_state.current_job_id = None
             else:
+                save_sent_email(st.session_state.db, email_data)
                 st.session_state.manual_email_content = None
-            st.balloons(); st.rerun()
+            reset_dashboard()
+            st.balloons(); st.rerun(scope="app")
 
     # --- NEW: Display Original Job Description ---
     with st.expander("Show Original Job Description", expanded=False):
@@ -381,10 +660,12 @@ st.title("🇨🇭 Swiss Assistenzarzt Job Application Bot")
 
 # Initialize session state keys
 default_states = {
-    'step': 'auth', 'gmail_service': None, 'cv_content': None,
-    'attachments': [], 'current_job_id': None,
+    'step': 'auth', 'gmail_service': None, 'cv_content': None, 'cv_summary': None,
+    'attachment_blobs': [], 'current_job_id': None,
     'generated_email_content': None, 'manual_email_content': None,
-    'db': None
+    'db': None, 'applied_jobs': None, 'stats': None,
+    'prewarmed_email': None, 'dashboard_emails': None, 'dashboard_cursors': [None], 'dashboard_page': 0,
+    'dashboard_bodies': {}
 }
 for key, value in default_states.items():
     if key not in st.session_state:
@@ -404,15 +685,16 @@ if st.session_state.step == "auth":
 
 elif st.session_state.step == "upload_cv":
     st.header("Step 2: Upload Your Documents")
-    user_data = get_user_data(st.session_state.db)
+    user_data = get_user_data_fields(st.session_state.db, ["translated_cv", "cv_summary"])
     if user_data.get("translated_cv") and st.button("Use previously saved CV"):
         st.session_state.cv_content = user_data["translated_cv"]
+        st.session_state.cv_summary = user_data.get("cv_summary")
         st.success("Loaded CV from database.")
         st.session_state.step = "main_app"; st.rerun()
 
     uploaded_files = st.file_uploader("Upload your CV (must be first) and other attachments.", accept_multiple_files=True)
     if uploaded_files:
-        st.session_state.attachments = uploaded_files
+        st.session_state.attachment_blobs = [(f.name, f.getvalue()) for f in uploaded_files]
         cv_file = uploaded_files[0]
         with st.spinner("Reading CV..."): cv_text = extract_text_from_pdf(cv_file)
         
@@ -421,29 +703,45 @@ elif st.session_state.step == "upload_cv":
             if st.button("Confirm and Proceed"):
                 if "English" in lang:
                     with st.spinner("Translating CV..."):
-                        translated = translate_cv_text(cv_text)
+                        first_job = None
+                        try:
+                            load_user_progress(st.session_state.db)
+                            first_job = find_next_job(_load_jobs(CSV_FILE), st.session_state.applied_jobs)
+                        except FileNotFoundError:
+                            pass
+                        first_details = job_details_from_row(*first_job) if first_job else None
+                        translated, first_email = translate_cv_and_prewarm_email(cv_text, first_details)
+                        if first_email:
+                            st.session_state.prewarmed_email = {'job_id': first_details['job_id'], 'content': first_email}
                         st.session_state.cv_content = translated
-                        update_user_data(st.session_state.db, {"translated_cv": translated})
+                    with st.spinner("Summarizing CV..."):
+                        st.session_state.cv_summary = summarize_cv(translated)
+                    update_user_data(st.session_state.db, {"translated_cv": translated, "cv_summary": st.session_state.cv_summary})
                 else:
                     st.session_state.cv_content = cv_text
+                    with st.spinner("Summarizing CV..."):
+                        st.session_state.cv_summary = summarize_cv(cv_text)
+                    # translated_cv holds the German CV the app works from, whether translated or uploaded in German
+                    update_user_data(st.session_state.db, {"translated_cv": cv_text, "cv_summary": st.session_state.cv_summary})
                 st.success("CV processed and saved!"); st.session_state.step = "main_app"; st.rerun()
             
 elif st.session_state.step == "main_app":
     if not st.session_state.cv_content:
-        user_data = get_user_data(st.session_state.db)
+        user_data = get_user_data_fields(st.session_state.db, ["translated_cv", "cv_summary"])
         st.session_state.cv_content = user_data.get("translated_cv")
+        st.session_state.cv_summary = user_data.get("cv_summary")
         if not st.session_state.cv_content:
             st.warning("CV has not been processed. Please return to the upload step.")
             if st.button("Go to Upload Step"):
                 st.session_state.step = "upload_cv"; st.rerun()
             st.stop()
 
-    user_data = get_user_data(st.session_state.db)
+    load_user_progress(st.session_state.db)
     with st.sidebar:
         st.header("Navigation")
         app_page = st.radio("Go to", ["Job Finder", "Add Manual Job", "Dashboard"])
         st.markdown("---")
-        stats = user_data.get("stats", {})
+        stats = st.session_state.stats
         st.header("📊 Statistics")
         st.metric("Emails Sent", stats.get("sent_count", 0))
         st.metric("Jobs Skipped", stats.get("skipped_count", 0))